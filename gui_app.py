@@ -3,6 +3,9 @@ import sys
 import numpy as np
 import matplotlib
 import logging
+import logging.handlers
+import queue
+import atexit
 import os # For path manipulation
 
 # Ensure data/logs directory exists
@@ -10,13 +13,25 @@ LOG_DIR = os.path.join(os.getcwd(), 'data', 'logs')
 os.makedirs(LOG_DIR, exist_ok=True) # Create if it doesn't exist
 
 # Configure logging
+# Records are only enqueued on the GUI thread; a background listener thread does the file/console writes
 LOG_FILE = os.path.join(LOG_DIR, 'robot_arm_simulator.log')
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                    handlers=[
-                        logging.FileHandler(LOG_FILE),
-                        logging.StreamHandler(sys.stdout) # Also log to console
-                    ])
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+file_handler = logging.FileHandler(LOG_FILE)
+file_handler.setFormatter(log_formatter)
+# Batch file writes; anything at ERROR or above is flushed straight away so it survives a crash
+buffered_file_handler = logging.handlers.MemoryHandler(capacity=1024, flushLevel=logging.ERROR, target=file_handler)
+console_handler = logging.StreamHandler(sys.stdout) # Also log to console
+console_handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1) # Unbounded, so logging never blocks the caller
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+log_listener = logging.handlers.QueueListener(log_queue, buffered_file_handler, console_handler, respect_handler_level=True)
+log_listener.start()
+# atexit runs in reverse order: drain the queue first, then flush the last buffered batch to the file
+atexit.register(buffered_file_handler.flush)
+atexit.register(log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Set the Matplotlib backend for PyQt5
@@ -35,25 +50,27 @@ except ImportError:
         QMessageBox.critical(None, "Backend Error", "No suitable Matplotlib backend found. Animation might not display correctly.")
 
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
     QPushButton, QLabel, QLineEdit, QMessageBox, QFrame, QSizePolicy, QSpacerItem
 )
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtCore import Qt, QSize, QTimer, QElapsedTimer
+from PyQt5.QtGui import QDoubleValidator, QIntValidator
 
 # Import your core simulation logic
 from rob_arm_sim.arm import RobotArm, OutOfReachError
-from rob_arm_sim.simulation import simulate_circular_path
-from rob_arm_sim.plotting import plot_sim_data_on_axes
+from rob_arm_sim.simulation import simulate_circular_path, SimResult
+from rob_arm_sim.plotting import plot_sim_data_on_axes, update_sim_data_lines
 
 
 class StaticPlotsWindow(QMainWindow):
-    """A separate window to display the static simulation plots."""
-    def __init__(self, sim_data: dict):
+    """A separate window to display the static simulation plots. Created once, then updated with new data."""
+    def __init__(self, sim_data: SimResult, run_params: dict):
         super().__init__()
         self.setWindowTitle("Simulation Data Plots")
         self.setGeometry(200, 200, 800, 800) # Initial size and position for the plots window
@@ -75,17 +92,36 @@ class StaticPlotsWindow(QMainWindow):
         ax_velocity = self.fig_plots.add_subplot(312)
         ax_acceleration = self.fig_plots.add_subplot(313)
         
+        self.sim_data = sim_data
+        self.run_params = run_params # Inputs that produced sim_data, to spot reruns with nothing new to draw
+        self.plot_lines = {}
         try:
-            plot_sim_data_on_axes(sim_data, ax_angles, ax_velocity, ax_acceleration)
+            self.plot_lines = plot_sim_data_on_axes(sim_data, ax_angles, ax_velocity, ax_acceleration)
             self.fig_plots.tight_layout() # Apply tight layout after plotting
             self.canvas_plots.draw_idle()
             logger.info("Static plots generated successfully.")
         except Exception as e:
-            logger.error(f"Error generating static plots: {e}", exc_info=True)
+            logger.error("Error generating static plots: %s", e, exc_info=True)
             QMessageBox.critical(self, "Plotting Error", f"Failed to generate static plots: {e}")
 
+    def update_data(self, sim_data: SimResult, run_params: dict):
+        """Shows new simulation data on the existing plot lines."""
+        if run_params == self.run_params: # A rerun with the same inputs has nothing new to draw
+            return
+        self.sim_data = sim_data
+        self.run_params = run_params
+        try:
+            update_sim_data_lines(self.plot_lines, sim_data)
+            self.canvas_plots.draw_idle()
+        except Exception as e:
+            logger.error("Error updating static plots: %s", e, exc_info=True)
+            QMessageBox.critical(self, "Plotting Error", f"Failed to update static plots: {e}")
+
 
 class MainWindow(QMainWindow):
+    # Animation artists redrawn every frame, in drawing order; the rest live in the blit background
+    MOVING_ARTISTS = ('links', 'traj', 'joint', 'ee')
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("2-DOF Robotic Arm Simulator")
@@ -93,7 +129,16 @@ class MainWindow(QMainWindow):
 
         self.arm = None
         self.sim_data = None
-        self.ani = None # To hold the animation object and prevent garbage collection
+        self.sim_params = None # Inputs the current sim_data was simulated from
+        self.ani_timer = None # Drives the blitted animation, one frame per tick
+        self._anim_ax = None
+        self._anim_artists = None
+        self._anim_bg = None
+        self._link_segs = None # Link segments of every frame, see _run_simulation
+        self._frame = 0
+        self._anim_interval = 1.0
+        self._anim_start_frame = 0 # Frame shown when the animation clock was (re)started
+        self._anim_clock = QElapsedTimer()
         self.static_plots_window = None # Reference to the separate plots window
         logger.info("MainWindow initialized.")
 
@@ -120,10 +165,8 @@ class MainWindow(QMainWindow):
             line_edit = QLineEdit(str(default_value))
             # Basic validation: ensure only numbers can be typed
             if input_type == float:
-                from PyQt5.QtGui import QDoubleValidator
                 line_edit.setValidator(QDoubleValidator())
             elif input_type == int:
-                from PyQt5.QtGui import QIntValidator
                 line_edit.setValidator(QIntValidator())
             
             hbox.addWidget(label)
@@ -172,6 +215,7 @@ class MainWindow(QMainWindow):
         self.canvas_anim.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.canvas_anim.setMinimumSize(400, 400)
         plots_layout.addWidget(self.canvas_anim, 1)
+        self.canvas_anim.mpl_connect('draw_event', self._on_anim_draw)
         logger.info("Animation canvas added to UI.")
 
         main_layout.addWidget(plots_frame, 2)
@@ -182,35 +226,30 @@ class MainWindow(QMainWindow):
         try:
             value_str = self.input_fields[key].text()
             if not value_str:
-                logger.warning(f"Input field '{key}' is empty.")
+                logger.warning("Input field '%s' is empty.", key)
                 raise ValueError(f"'{key}' cannot be empty.")
             
             # This line handles conversion to float or int based on input_type
             value = input_type(value_str)
 
-            logger.debug(f"Input '{key}' read as: {value}")
+            logger.debug("Input '%s' read as: %s", key, value)
             return value
         except ValueError as e:
-            logger.error(f"Validation error for input '{key}': {e}")
+            logger.error("Validation error for input '%s': %s", key, e)
             raise ValueError(f"Invalid input for '{key}': {e}. Please enter a valid number.")
 
     def _run_simulation(self):
         logger.info("Run Simulation button clicked. Starting simulation process.")
         # Stop any existing animation before starting a new one
-        if self.ani:
-            self.ani.event_source.stop()
-            self.ani = None
-            logger.info("Stopped existing animation.")
+        self._stop_animation()
         
         # Close static plots window if open
         if self.static_plots_window and self.static_plots_window.isVisible():
-            self.static_plots_window.close()
-            self.static_plots_window = None
+            self.static_plots_window.close() # Only hidden, kept for reuse
             logger.info("Closed existing static plots window.")
 
-        # Clear existing animation plot contents
-        self.fig_anim.clear()
-        self.canvas_anim.draw_idle()
+        # Hide the previous animation; its artists are reused for the new run
+        self._hide_anim_axes()
         logger.info("Cleared animation plot.")
         
         self.show_plots_button.setEnabled(False)
@@ -233,7 +272,7 @@ class MainWindow(QMainWindow):
                 'anim_interval': self._get_input_value('anim_interval', float)
                 # ----------------------------------------------------
             }
-            logger.info(f"Input parameters read: {params}")
+            logger.info("Input parameters read: %s", params)
 
             if params['L1'] <= 0 or params['L2'] <= 0:
                 raise ValueError("Link lengths (L1, L2) must be positive.")
@@ -249,7 +288,7 @@ class MainWindow(QMainWindow):
 
             self.arm = RobotArm(L1=params['L1'], L2=params['L2'],
                                 base_x=params['base_x'], base_y=params['base_y'])
-            logger.info(f"RobotArm initialized with L1={self.arm.L1}, L2={self.arm.L2}, base=({self.arm.base_x},{self.arm.base_y}).")
+            logger.info("RobotArm initialized with L1=%s, L2=%s, base=(%s,%s).", self.arm.L1, self.arm.L2, self.arm.base_x, self.arm.base_y)
 
             # Run the core simulation logic
             self.sim_data = simulate_circular_path(
@@ -258,21 +297,20 @@ class MainWindow(QMainWindow):
                 circle_center_y=params['b'],
                 circle_radius=params['r'],
                 speed_v=params['v'],
-                dt=params['dt']
+                dt=params['dt'],
+                dtype=np.float32 # float32 is plenty for pixels and halves the data moved when drawing
             )
+            self.sim_params = {key: value for key, value in params.items() if key != 'anim_interval'}
             logger.info("Simulation data generated successfully.")
             QMessageBox.information(self, "Simulation Status", "Simulation successful. All points on the circle are reachable.")
             self.show_plots_button.setEnabled(True)
             logger.info("Show Plots button enabled.")
 
             # --- Configure and start animation ---
-            ax_anim = self.fig_anim.add_subplot(111)
-            ax_anim.set_aspect('equal', adjustable='box')
-            ax_anim.set_title("2-DOF Robotic Arm Animation")
-            ax_anim.grid(True)
-            ax_anim.set_xlabel("X-coordinate (mm)")
-            ax_anim.set_ylabel("Y-coordinate (mm)")
-            logger.info("Animation plot axes configured.")
+            if self._anim_ax is None:
+                self._create_anim_artists()
+            ax_anim = self._anim_ax
+            artists = self._anim_artists
 
             # DYNAMICALLY SET X AND Y LIMITS FOR ANIMATION PLOT
             max_reach = self.arm.L1 + self.arm.L2
@@ -309,64 +347,169 @@ class MainWindow(QMainWindow):
             
             ax_anim.set_xlim(x_min_tight - x_range * padding_factor, x_max_tight + x_range * padding_factor)
             ax_anim.set_ylim(y_min_tight - y_range * padding_factor, y_max_tight + y_range * padding_factor)
-            logger.info(f"Animation plot limits set to X:[{ax_anim.get_xlim()[0]:.2f}, {ax_anim.get_xlim()[1]:.2f}], Y:[{ax_anim.get_ylim()[0]:.2f}, {ax_anim.get_ylim()[1]:.2f}].")
-
+            # The view is fixed for the whole run, so stop matplotlib re-running autoscale as artist data changes
+            ax_anim.set_autoscale_on(False)
+            logger.info("Animation plot limits set to X:[%.2f, %.2f], Y:[%.2f, %.2f].", *ax_anim.get_xlim(), *ax_anim.get_ylim())
+
+            # Only the properties that depend on the inputs change between runs
+            artists['base'].set_data([self.arm.base_x], [self.arm.base_y])
+            artists['circle'].set_center((params['a'], params['b']))
+            artists['circle'].set_radius(params['r'])
+
+            # Link segments for every frame, built once from the precomputed positions.
+            # Indexed [frame, link, point, x/y]: link 0 is base->joint, link 1 is joint->end effector.
+            segs = np.empty((len(self.sim_data), 2, 2, 2), dtype=self.sim_data.data.dtype)
+            segs[:, 0, 0, 0] = self.arm.base_x
+            segs[:, 0, 0, 1] = self.arm.base_y
+            segs[:, 0, 1, 0] = segs[:, 1, 0, 0] = self.sim_data['joint_x']
+            segs[:, 0, 1, 1] = segs[:, 1, 0, 1] = self.sim_data['joint_y']
+            segs[:, 1, 1, 0] = self.sim_data['end_effector_x']
+            segs[:, 1, 1, 1] = self.sim_data['end_effector_y']
+            self._link_segs = segs
+            ax_anim.set_visible(True)
+            # Tick labels may have changed width with the new limits
             self.fig_anim.tight_layout()
-            self.canvas_anim.draw_idle()
-            logger.info("Animation plot redrawn with initial state.")
-
-            # Initial plot elements for animation
-            ax_anim.plot(self.arm.base_x, self.arm.base_y, 'ro', markersize=8, label='Arm Base')
-            circle_patch = plt.Circle((params['a'], params['b']), params['r'], color='grey', fill=False, linestyle='--', label='Target Circle')
-            ax_anim.add_patch(circle_patch)
-
-            line1, = ax_anim.plot([], [], 'b-', lw=3, label='Link 1')
-            line2, = ax_anim.plot([], [], 'g-', lw=3, label='Link 2')
-            joint_point, = ax_anim.plot([], [], 'bo', markersize=5, label='Joint')
-            end_effector_point, = ax_anim.plot([], [], 'go', markersize=7, label='End Effector')
-            trajectory_line, = ax_anim.plot([], [], 'r--', lw=1, alpha=0.6, label='End Effector Trajectory')
-            ax_anim.legend(loc='upper right')
-            logger.info("Animation elements initialized.")
-
-            def init_anim():
-                line1.set_data([], [])
-                line2.set_data([], [])
-                joint_point.set_data([], [])
-                end_effector_point.set_data([], [])
-                trajectory_line.set_data([], [])
-                return line1, line2, joint_point, end_effector_point, trajectory_line
-
-            def update_anim(frame):
-                t1 = self.sim_data['theta1'][frame]
-                t2 = self.sim_data['theta2'][frame]
-                joint_x, joint_y, ee_x, ee_y = self.arm.get_joint_positions(t1, t2)
-                line1.set_data([self.arm.base_x, joint_x], [self.arm.base_y, joint_y])
-                line2.set_data([joint_x, ee_x], [joint_y, ee_y])
-                joint_point.set_data([joint_x], [joint_y])
-                end_effector_point.set_data([ee_x], [ee_y])
-                trajectory_line.set_data(self.sim_data['end_effector_x'][:frame+1], self.sim_data['end_effector_y'][:frame+1])
-                return line1, line2, joint_point, end_effector_point, trajectory_line
-
-            # The 'interval' parameter of FuncAnimation can accept a float
-            self.ani = animation.FuncAnimation(
-                self.fig_anim, update_anim, frames=len(self.sim_data['time']),
-                init_func=init_anim, blit=True, interval=params['anim_interval'], repeat=True
-            )
-            logger.info(f"Animation started with {len(self.sim_data['time'])} frames and interval {params['anim_interval']}ms.")
+            logger.info("Animation elements updated for this run.")
+
+            # Frames are derived from elapsed time, so ticks that arrive late skip ahead instead of lagging behind
+            self._anim_interval = params['anim_interval']
+            self._anim_start_frame = 0
+            self.ani_timer = QTimer(self)
+            self.ani_timer.setTimerType(Qt.PreciseTimer)
+            self.ani_timer.setInterval(max(1, round(params['anim_interval']))) # QTimer takes whole ms
+            self.ani_timer.timeout.connect(self._on_anim_tick)
+
+            # Full draw of the static layout; the draw_event handler captures the background for blitting
+            self._frame = 0
+            self.canvas_anim.draw()
+
+            self._anim_clock.start()
+            self.ani_timer.start()
+            logger.info("Animation started with %d frames and interval %sms.", len(self.sim_data), params['anim_interval'])
 
         except ValueError as e:
-            logger.error(f"Input Error during simulation: {e}")
+            logger.error("Input Error during simulation: %s", e)
             QMessageBox.critical(self, "Input Error", f"Invalid input: {e}")
             self._clear_all_plots()
         except OutOfReachError as e:
-            logger.error(f"Simulation Error: Out of Bounds: {e}")
+            logger.error("Simulation Error: Out of Bounds: %s", e)
             QMessageBox.critical(self, "Simulation Error: Out of Bounds", f"The arm cannot reach the entire path. {e}")
             self._clear_all_plots()
         except Exception as e:
-            logger.critical(f"An unexpected error occurred during simulation: {e}", exc_info=True)
+            logger.critical("An unexpected error occurred during simulation: %s", e, exc_info=True)
             QMessageBox.critical(self, "Unexpected Error", f"An unexpected error occurred: {e}")
             self._clear_all_plots()
 
+    def _create_anim_artists(self):
+        """Builds the animation axes and artists on the first run; later runs only update them."""
+        ax_anim = self.fig_anim.add_subplot(111)
+        ax_anim.set_aspect('equal', adjustable='box')
+        ax_anim.set_title("2-DOF Robotic Arm Animation")
+        ax_anim.grid(True)
+        ax_anim.set_xlabel("X-coordinate (mm)")
+        ax_anim.set_ylabel("Y-coordinate (mm)")
+
+        base_point, = ax_anim.plot([], [], 'ro', markersize=8, label='Arm Base')
+        circle_patch = plt.Circle((0, 0), 1, color='grey', fill=False, linestyle='--', label='Target Circle')
+        ax_anim.add_patch(circle_patch)
+
+        # Both links live in one collection, fed per frame from the precomputed segments
+        links = LineCollection([], colors=['b', 'g'], linewidths=3)
+        ax_anim.add_collection(links, autolim=False)
+        joint_point, = ax_anim.plot([], [], 'bo', markersize=5, label='Joint')
+        end_effector_point, = ax_anim.plot([], [], 'go', markersize=7, label='End Effector')
+        trajectory_line, = ax_anim.plot([], [], 'r--', lw=1, alpha=0.6, label='End Effector Trajectory')
+        # Proxy handles keep a legend entry per link
+        link1_handle = Line2D([], [], color='b', lw=3, label='Link 1')
+        link2_handle = Line2D([], [], color='g', lw=3, label='Link 2')
+        ax_anim.legend(handles=[base_point, link1_handle, link2_handle, joint_point,
+                                end_effector_point, trajectory_line, circle_patch], loc='upper right')
+
+        self._anim_ax = ax_anim
+        self._anim_artists = {
+            'base': base_point,
+            'circle': circle_patch,
+            'links': links,
+            'traj': trajectory_line,
+            'joint': joint_point,
+            'ee': end_effector_point,
+        }
+        # Moving artists are animated so they stay out of the cached background and are drawn by blitting only
+        for name in self.MOVING_ARTISTS:
+            self._anim_artists[name].set_animated(True)
+        logger.info("Animation plot axes and elements created.")
+
+    def _hide_anim_axes(self):
+        """Hides the animation axes, keeping its artists for the next run."""
+        if self._anim_ax is not None:
+            self._anim_ax.set_visible(False)
+            self.canvas_anim.draw_idle()
+
+    def hideEvent(self, event):
+        """Pauses the animation while the window is hidden or minimised."""
+        if self.ani_timer:
+            self.ani_timer.stop()
+            logger.info("Animation paused, window hidden.")
+        super().hideEvent(event)
+
+    def showEvent(self, event):
+        """Resumes a paused animation from the frame it stopped on."""
+        super().showEvent(event)
+        if self.ani_timer and not self.ani_timer.isActive():
+            self._anim_start_frame = self._frame
+            self._anim_clock.restart()
+            self.ani_timer.start()
+            logger.info("Animation resumed, window shown.")
+
+    def _on_anim_draw(self, event):
+        """Re-captures the blit background whenever the animation canvas is fully redrawn (e.g. on resize)."""
+        if self.ani_timer is None:
+            return
+        self._anim_bg = self.canvas_anim.copy_from_bbox(self._anim_ax.bbox)
+        # The pending paint of this draw shows the artists, so no blit is needed here
+        self._draw_anim_frame(blit=False)
+
+    def _on_anim_tick(self):
+        """Moves the animation to the frame due at the current time, wrapping around to repeat the path."""
+        if not self.canvas_anim.isVisible():
+            return # Nothing would be seen, don't spend time drawing
+        elapsed_frames = int(self._anim_clock.elapsed() / self._anim_interval)
+        frame = (self._anim_start_frame + elapsed_frames) % len(self.sim_data['time'])
+        if frame == self._frame:
+            return # Nothing changed since the last tick, skip the redraw
+        self._frame = frame
+        self._draw_anim_frame()
+
+    def _draw_anim_frame(self, blit: bool = True):
+        """Updates the moving artists for the current frame and blits them over the cached background."""
+        frame = self._frame
+        artists = self._anim_artists
+        joint_x = self.sim_data['joint_x']
+        joint_y = self.sim_data['joint_y']
+        ee_x = self.sim_data['end_effector_x']
+        ee_y = self.sim_data['end_effector_y']
+
+        artists['links'].set_segments(self._link_segs[frame])
+        artists['joint'].set_data(joint_x[frame:frame+1], joint_y[frame:frame+1])
+        artists['ee'].set_data(ee_x[frame:frame+1], ee_y[frame:frame+1])
+        artists['traj'].set_data(ee_x[:frame+1], ee_y[:frame+1])
+
+        if blit:
+            self.canvas_anim.restore_region(self._anim_bg)
+        for name in self.MOVING_ARTISTS:
+            self._anim_ax.draw_artist(artists[name])
+        if blit:
+            self.canvas_anim.blit(self._anim_ax.bbox)
+
+    def _stop_animation(self):
+        """Stops the animation timer and drops the blitting state."""
+        if self.ani_timer:
+            self.ani_timer.stop()
+            self.ani_timer.deleteLater() # Parented to the window, so Qt would otherwise keep it (and its slot) alive
+            self.ani_timer = None
+            logger.info("Stopped existing animation.")
+        self._anim_bg = None
+
     def _show_static_plots(self):
         logger.info("Show Plots button clicked.")
         if self.sim_data is None:
@@ -380,28 +523,28 @@ class MainWindow(QMainWindow):
             logger.info("Static plots window already open, brought to front.")
         else:
             try:
-                self.static_plots_window = StaticPlotsWindow(self.sim_data)
+                # The window (and its figure) is built once and reused with new data afterwards
+                if self.static_plots_window is None:
+                    self.static_plots_window = StaticPlotsWindow(self.sim_data, self.sim_params)
+                    logger.info("New static plots window created.")
+                else:
+                    self.static_plots_window.update_data(self.sim_data, self.sim_params)
                 self.static_plots_window.show()
-                logger.info("New static plots window opened.")
+                logger.info("Static plots window opened.")
             except Exception as e:
-                logger.error(f"Failed to open static plots window: {e}", exc_info=True)
+                logger.error("Failed to open static plots window: %s", e, exc_info=True)
                 QMessageBox.critical(self, "Error", f"Could not open plots window: {e}")
 
     def _clear_all_plots(self):
         """Helper to clear both animation and static plots and disable button."""
         logger.info("Clearing all plots and resetting state.")
-        if self.ani:
-            self.ani.event_source.stop()
-            self.ani = None
-            logger.info("Stopped animation during plot clear.")
-        self.fig_anim.clear()
-        self.canvas_anim.draw_idle()
+        self._stop_animation()
+        self._hide_anim_axes()
         self.show_plots_button.setEnabled(False)
         logger.info("Animation plot cleared and 'Show Plots' button disabled.")
         
         if self.static_plots_window and self.static_plots_window.isVisible():
-            self.static_plots_window.close()
-            self.static_plots_window = None
+            self.static_plots_window.close() # Only hidden, kept for reuse
             logger.info("Closed static plots window during plot clear.")
 
 
@@ -0,0 +1,128 @@
+# rob_arm_sim/_kernels.py
+import math
+import logging
+
+logger = logging.getLogger(__name__) # Get logger for this module
+
+# Numba is optional: when it is installed the kernels below are JIT-compiled to machine code,
+# otherwise they run as plain Python functions with identical results.
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit, usable both as @njit and @njit(...)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+logger.debug("Kinematics kernels %s.", 'JIT-compiled with numba' if HAVE_NUMBA else 'running without numba')
+
+# Slack on the cosine-law reach test, so points on the reach boundary are not rejected over rounding error
+REACH_TOLERANCE = 1e-12
+
+# Paths shorter than this, such as the GUI's laps of about a thousand samples, stay on the serial kernel.
+# The cut-off is a conservative guess that has not been tuned on multi-core hardware.
+PARALLEL_MIN_POINTS = 20000
+
+
+@njit(cache=True, fastmath=True)
+def fk_scalar(L1, L2, base_x, base_y, theta1, theta2):
+    """
+    Forward kinematics for a single pair of joint angles
+
+    Returns:
+        tuple[float, float, float, float]: (joint_x, joint_y, end_effector_x, end_effector_y)
+    """
+    joint_x = base_x + L1 * math.cos(theta1)
+    joint_y = base_y + L1 * math.sin(theta1)
+    theta12 = theta1 + theta2
+    return joint_x, joint_y, joint_x + L2 * math.cos(theta12), joint_y + L2 * math.sin(theta12)
+
+
+@njit(cache=True, fastmath=True)
+def ik_scalar(L1, L2, base_x, base_y, target_x, target_y):
+    """
+    "Elbow up" inverse kinematics for a single target point
+    The caller is responsible for checking that the target is reachable
+
+    Returns:
+        tuple[float, float]: (theta1, theta2) in radians
+    """
+    dx = target_x - base_x
+    dy = target_y - base_y
+    D2 = dx*dx + dy*dy
+
+    #calculate theta2 using cosine law
+    #cos(theta2)=(D^2-L1^2-L2^2)/(2*L1*L2), using cos(pi-x) as -cos(x)
+    # Clamp argument to acos to prevent NaN due to floating point inaccuracies
+    cos_theta2 = (D2 - L1*L1 - L2*L2) / (2 * L1 * L2)
+    cos_theta2 = -1.0 if cos_theta2 < -1.0 else (1.0 if cos_theta2 > 1.0 else cos_theta2)
+    theta2 = math.acos(cos_theta2)
+    sin_theta2 = math.sqrt(1.0 - cos_theta2*cos_theta2) # theta2 is in [0, pi], so sin is never negative
+
+    #theta1 = alpha - beta, alpha = angle of the target from the base,
+    #beta = angle between the line from base to target and the first link, from the triangle formed by both links
+    # (atan2 stays defined when the target is the base, where any theta1 works)
+    theta1 = math.atan2(dy, dx) - math.atan2(L2 * sin_theta2, L1 + L2 * cos_theta2)
+
+    return theta1, theta2
+
+
+@njit(cache=True, fastmath=True)
+def circle_points(center_x, center_y, radius, angles, x, y):
+    """
+    Points on a circle at the given angles, written into x and y
+    cos and sin of each angle sit in one loop body, so the compiler can evaluate them with a single sincos
+    """
+    for i in range(angles.shape[0]):
+        x[i] = center_x + radius * math.cos(angles[i])
+        y[i] = center_y + radius * math.sin(angles[i])
+
+
+@njit(cache=True)
+def first_unreachable(L1, L2, base_x, base_y, target_x, target_y):
+    """
+    Scans an array of target points for the first one outside the arm's reach
+
+    Returns:
+        int: index of the first unreachable point, or -1 if every point is reachable
+    """
+    # Same test as the IK itself: reachable exactly when the cosine-law cos(theta2) is within [-1, 1]
+    L_sq = L1*L1 + L2*L2
+    two_L1_L2 = 2 * L1 * L2
+    for i in range(target_x.shape[0]):
+        dx = target_x[i] - base_x
+        dy = target_y[i] - base_y
+        if abs((dx*dx + dy*dy - L_sq) / two_L1_L2) > 1.0 + REACH_TOLERANCE:
+            return i
+    return -1
+
+
+@njit(cache=True, fastmath=True)
+def _path_point(i, L1, L2, base_x, base_y, target_x, target_y, theta1, theta2, joint_x, joint_y, end_effector_x, end_effector_y):
+    t1, t2 = ik_scalar(L1, L2, base_x, base_y, target_x[i], target_y[i])
+    theta1[i] = t1
+    theta2[i] = t2
+    joint_x[i], joint_y[i], end_effector_x[i], end_effector_y[i] = fk_scalar(L1, L2, base_x, base_y, t1, t2)
+
+
+@njit(cache=True, fastmath=True)
+def path_kinematics(L1, L2, base_x, base_y, target_x, target_y, theta1, theta2, joint_x, joint_y, end_effector_x, end_effector_y):
+    """
+    Fused IK and FK over a whole path of reachable target points, writing into the given output arrays
+    """
+    for i in range(target_x.shape[0]):
+        _path_point(i, L1, L2, base_x, base_y, target_x, target_y, theta1, theta2, joint_x, joint_y, end_effector_x, end_effector_y)
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def path_kinematics_parallel(L1, L2, base_x, base_y, target_x, target_y, theta1, theta2, joint_x, joint_y, end_effector_x, end_effector_y):
+    """
+    Same as path_kinematics, with the independent points split across CPU cores
+    """
+    for i in prange(target_x.shape[0]):
+        _path_point(i, L1, L2, base_x, base_y, target_x, target_y, theta1, theta2, joint_x, joint_y, end_effector_x, end_effector_y)
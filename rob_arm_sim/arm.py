@@ -1,7 +1,28 @@
+import math
 import numpy as np
 import logging
+from functools import lru_cache
+from ._kernels import fk_scalar, ik_scalar, REACH_TOLERANCE
 logger = logging.getLogger(__name__)
 
+# Scalar FK/IK results keyed on the arm geometry and inputs, so repeated interactive queries skip the trig
+@lru_cache(maxsize=8192)
+def _fk_cached(L1, L2, base_x, base_y, theta1, theta2):
+    return fk_scalar(L1, L2, base_x, base_y, theta1, theta2)
+
+@lru_cache(maxsize=8192)
+def _ik_cached(L1, L2, base_x, base_y, target_x, target_y):
+    return ik_scalar(L1, L2, base_x, base_y, target_x, target_y)
+
+# The cosine-law reach test, shared by the NumPy and JAX paths (the numba kernels are its compiled twin)
+def _cos_theta2(dx, dy, L1, L2):
+    """cos(theta2) from the cosine law for target offsets (dx, dy) from the base; reachable exactly when within [-1, 1]"""
+    return (dx*dx + dy*dy - (L1*L1 + L2*L2)) / (2 * L1 * L2)
+
+def _beyond_reach(cos_theta2, tolerance=REACH_TOLERANCE):
+    """Mask of the targets whose cosine-law term puts them outside the arm's reach"""
+    return abs(cos_theta2) > 1.0 + tolerance
+
 class OutOfReachError(Exception):
     """custom exception for when a target point is out of the arm's reach"""
     pass
@@ -33,7 +54,7 @@ class RobotArm:
         self.base_x=base_x
         self.base_y=base_y
 
-        logger.info(f"RobotArm initialised: L1={L1}, L2={L2}, Base=({base_x},{base_y}) ")
+        logger.info("RobotArm initialised: L1=%s, L2=%s, Base=(%s,%s) ", L1, L2, base_x, base_y)
 
     def forward_kinematics(self, theta1: float, theta2: float) -> tuple[float,float]:
         """
@@ -47,17 +68,48 @@ class RobotArm:
             tuple[float, float]: A tuple (end_effector_x, end_effector_y) repping the end effector's position    
         """
 
-        #intermediate joint
-        joint_x = self.base_x + self.L1 * np.cos(theta1)
-        joint_y = self.base_y + self.L1 * np.sin(theta1)
+        _, _, end_effector_x, end_effector_y = _fk_cached(self.L1, self.L2, self.base_x, self.base_y, theta1, theta2)
 
-        #end effector pos
-        end_effector_x = joint_x + self.L2 * np.cos(theta1+theta2)
-        end_effector_y = joint_y + self.L2 * np.sin(theta1+theta2)
-
-        logger.debug(f"FK: theta1={np.degrees(theta1):.2f}deg, theta2={np.degrees(theta2):.2f}deg -> EE=({end_effector_x:.2f},{end_effector_y:.2f})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("FK: theta1=%.2fdeg, theta2=%.2fdeg -> EE=(%.2f,%.2f)", math.degrees(theta1), math.degrees(theta2), end_effector_x, end_effector_y)
 
         return end_effector_x, end_effector_y
+
+    def forward_kinematics_batch(self, theta1: np.ndarray, theta2: np.ndarray,
+                                 out: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray] = None) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorised forward kinematics over whole arrays of joint angles
+
+        Args:
+            theta1 (np.ndarray): Angles of the first link with respect to the horizontal, in radians
+            theta2 (np.ndarray): Angles of the second link relative to the first link, in radians
+            out (tuple, optional): Preallocated (joint_x, joint_y, end_effector_x, end_effector_y) arrays to write the results into
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: (joint_x, joint_y, end_effector_x, end_effector_y) arrays
+        """
+        theta1 = np.asarray(theta1)
+        theta2 = np.asarray(theta2)
+        out_jx, out_jy, out_ex, out_ey = (None,) * 4 if out is None else out
+
+        #intermediate joints
+        joint_x = np.cos(theta1, out=out_jx)
+        joint_x *= self.L1
+        joint_x += self.base_x
+        joint_y = np.sin(theta1, out=out_jy)
+        joint_y *= self.L1
+        joint_y += self.base_y
+
+        #end effector positions; a given x output holds the summed angle until its cosine overwrites it in place
+        theta12 = np.add(theta1, theta2, out=out_ex)
+        end_effector_y = np.sin(theta12, out=out_ey)
+        end_effector_x = np.cos(theta12, out=out_ex)
+        end_effector_x *= self.L2
+        end_effector_x += joint_x
+        end_effector_y *= self.L2
+        end_effector_y += joint_y
+
+        return joint_x, joint_y, end_effector_x, end_effector_y
     
     def is_reachable(self, target_x: float, target_y: float) -> bool:
         """
@@ -71,20 +123,16 @@ class RobotArm:
             bool: True if the point is reachable, else false
         """
 
-        #dist from the base to the target
+        #reachable when the cosine law has a solution, i.e. between |L1-L2| and L1+L2 from the base,
+        #with the same rounding slack as the batch and simulation paths
         dx = target_x - self.base_x
         dy = target_y - self.base_y
-        dist2tar = np.sqrt(dx**2 + dy**2)
+        reachable = not _beyond_reach(_cos_theta2(dx, dy, self.L1, self.L2))
 
-        #max reach is L1+L2
-        max_reach = self.L1 + self.L2
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Target (%.2f,%.2f) reachable=%s. Distance=%.2f", target_x, target_y, reachable, math.hypot(dx, dy))
 
-        #min reach is |L1-L2|
-        min_reach = abs(self.L1-self.L2)
-
-        logger.debug(f"Target ({target_x:.2f},{target_y:.2f}) is reachable. Distance={dist2tar:.2f}")
-
-        return min_reach <= dist2tar <= max_reach
+        return reachable
     
     def inv_kinematics(self, target_x: float, target_y: float) -> tuple[float,float]:
         """
@@ -103,39 +151,89 @@ class RobotArm:
         """
 
         if not self.is_reachable(target_x,target_y):
-            logger.warning(f"Attempted IK for unreachable point ({target_x:.2f}, {target_y:.2f}).")
+            logger.warning("Attempted IK for unreachable point (%.2f, %.2f).", target_x, target_y)
             raise OutOfReachError(f"Target point ({target_x: .2f}, {target_y: .2f}) is out of arm's reach")
         
-        dx = target_x - self.base_x
-        dy = target_y - self.base_y
-        D = np.sqrt(dx**2 + dy**2)
-
-        #calculate theta2 using cosine law
-        #cos(theta2)=(D^2-L1^2-L2^2)/(2*L1*L2), using cos(pi-x) as -cos(x)
+        theta1, theta2 = _ik_cached(self.L1, self.L2, self.base_x, self.base_y, target_x, target_y)
 
-        # Clamp argument to acos to prevent NaN due to floating point inaccuracies
-        # Ensure the value is within [-1, 1]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("IK: Target (%.2f,%.2f) -> theta1=%.2fdeg, theta2=%.2fdeg", target_x, target_y, math.degrees(theta1), math.degrees(theta2))
 
-        arg_theta2 = (D**2 - self.L1**2 - self.L2**2) / (2 * self.L1 * self.L2)
-        arg_theta2 = np.clip(arg_theta2, -1.0, 1.0)
-        theta2 = np.arccos(arg_theta2)
+        return theta1, theta2
+    
+    def first_unreachable_batch(self, target_x: np.ndarray, target_y: np.ndarray) -> int:
+        """
+        Vectorised reachability check over whole arrays of target points, in one pass
 
-        #calculate theta1
-        #alpha=angle of the target from the base
-        alpha= np.arctan2(dy,dx)
+        Args:
+            target_x(np.ndarray): X-coords of the target points
+            target_y(np.ndarray): Y-coords of the target points
 
-        # beta = angle between the line from base to target and the first link
-        # cos(beta) = (L1^2+D^2-L2^2)/(2*L1*D)
-        arg_beta = (self.L1**2 + D**2 - self.L2**2) / (2 * self.L1 * D)
-        arg_beta = np.clip(arg_beta, -1.0, 1.0)
-        beta = np.arccos(arg_beta)
+        Returns:
+            int: flat index of the first unreachable point, or -1 if every point is reachable
+        """
+        dx = np.asarray(target_x, dtype=float) - self.base_x
+        dy = np.asarray(target_y, dtype=float) - self.base_y
+        return self._reach_check(dx, dy)[1]
+
+    def _reach_check(self, dx, dy) -> tuple[np.ndarray, int]:
+        """cos(theta2) for every target offset, and the flat index of the first unreachable one (-1 if none)"""
+        cos_theta2 = _cos_theta2(dx, dy, self.L1, self.L2)
+        unreachable = _beyond_reach(cos_theta2)
+        return cos_theta2, (int(np.argmax(unreachable)) if np.any(unreachable) else -1)
+
+    def inv_kinematics_batch(self, target_x: np.ndarray, target_y: np.ndarray,
+                             out: tuple[np.ndarray, np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorised inverse kinematics over whole arrays of target points
+        Returns the same "elbow up" solution as inv_kinematics for every point
 
-        theta1=alpha-beta
+        Args:
+            target_x(np.ndarray): X-coords of the target points
+            target_y(np.ndarray): Y-coords of the target points
+            out(tuple, optional): Preallocated (theta1,theta2) arrays to write the results into
 
-        logger.debug(f"IK: Target ({target_x:.2f},{target_y:.2f}) -> theta1={np.degrees(theta1):.2f}deg, theta2={np.degrees(theta2):.2f}deg")
+        Returns:
+            tuple[np.ndarray,np.ndarray]: (theta1,theta2) arrays in radians
 
+        Raises:
+            OutOfReachError: if any target point is outside the arm's reachable workspace
+        """
+        #broadcast up front, so the in-place steps below and the flat index of a bad point see every target
+        target_x, target_y = np.broadcast_arrays(np.asarray(target_x, dtype=float), np.asarray(target_y, dtype=float))
+        shape = target_x.shape
+
+        #the in-place steps below need real arrays, so scalar targets are solved as 1-element arrays
+        dx = np.atleast_1d(target_x - self.base_x)
+        dy = np.atleast_1d(target_y - self.base_y)
+        #theta2 from the cosine law, which also gives the reachability of every point in one pass
+        cos_theta2, i = self._reach_check(dx, dy)
+        if i >= 0:
+            bad_x, bad_y = target_x.flat[i], target_y.flat[i]
+            logger.warning("Attempted IK for unreachable point (%.2f, %.2f).", bad_x, bad_y)
+            raise OutOfReachError(f"Target point ({bad_x: .2f}, {bad_y: .2f}) is out of arm's reach")
+
+        #clamp the points on the reach boundary against floating point drift
+        np.clip(cos_theta2, -1.0, 1.0, out=cos_theta2)
+        out_theta1, out_theta2 = (None, None) if out is None else out
+        theta2 = np.arccos(cos_theta2, out=out_theta2)
+        sin_theta2 = cos_theta2*cos_theta2
+        np.subtract(1.0, sin_theta2, out=sin_theta2)
+        np.sqrt(sin_theta2, out=sin_theta2) # theta2 is in [0, pi], so sin is never negative
+
+        #theta1 = alpha - beta, with beta the angle the target direction makes with the first link
+        theta1 = np.arctan2(dy, dx, out=out_theta1)
+        #the triangle sides for beta overwrite the sin/cos buffers, and beta itself dx, none of which are needed again
+        sin_theta2 *= self.L2
+        cos_theta2 *= self.L2
+        cos_theta2 += self.L1
+        theta1 -= np.arctan2(sin_theta2, cos_theta2, out=dx)
+
+        if out is None:
+            #back to the shape of the targets, so scalar targets give scalar angles like forward_kinematics_batch
+            theta1, theta2 = theta1.reshape(shape)[()], theta2.reshape(shape)[()]
         return theta1, theta2
-    
+
     def get_joint_positions(self,theta1: float, theta2: float) -> tuple[float, float]:
         """
         Returns the (x,y) coordinates of the intermediate joint and end effector.
@@ -147,7 +245,4 @@ class RobotArm:
         Returns:
             tuple[float, float, float, float]: (joint_x, joint_y, end_effector_x, end_effector_y)
         """
-        joint_x = self.base_x + self.L1 * np.cos(theta1)
-        joint_y = self.base_y + self.L1 * np.sin(theta1)
-        end_effector_x, end_effector_y = self.forward_kinematics(theta1, theta2)
-        return joint_x, joint_y, end_effector_x, end_effector_y
\ No newline at end of file
+        return _fk_cached(self.L1, self.L2, self.base_x, self.base_y, theta1, theta2)
@@ -1,20 +1,33 @@
 # rob_arm_sim/plotting.py
 import matplotlib.pyplot as plt
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+import math
 import numpy as np
 import logging
+from .simulation import SimResult
 
 logger = logging.getLogger(__name__) # Get logger for this module
 
-def plot_sim_data_on_axes(sim_data: dict, ax1, ax2, ax3):
+
+class _DegreeLocator(MaxNLocator):
+    """Places ticks at round degree values on an axis whose data is in radians."""
+    def tick_values(self, vmin, vmax):
+        return np.radians(super().tick_values(np.degrees(vmin), np.degrees(vmax)))
+
+def plot_sim_data_on_axes(sim_data: SimResult, ax1, ax2, ax3) -> dict:
     """
     Generates plots for joint angles, angular velocities,
     and angular accelerations over time on provided matplotlib axes.
+    The axes are expected to be empty; to show new data on them later, use update_sim_data_lines.
 
     Args:
-        sim_data (dict): Dictionary containing simulation data.
+        sim_data (SimResult): Simulation data, columns accessed by name.
         ax1 (matplotlib.axes.Axes): Axes for joint angles plot.
         ax2 (matplotlib.axes.Axes): Axes for angular velocities plot.
         ax3 (matplotlib.axes.Axes): Axes for angular accelerations plot.
+
+    Returns:
+        dict: The created Line2D artists, keyed by the sim_data column they show.
     """
     logger.info("Starting generation of static plots on provided axes.")
     try:
@@ -23,30 +36,31 @@ def plot_sim_data_on_axes(sim_data: dict, ax1, ax2, ax3):
         # Ensure data is not empty
         if len(time) == 0:
             logger.warning("No time data available for plotting. Skipping plot generation.")
-            return
+            return {}
 
-        theta1 = np.degrees(sim_data['theta1']) # Convert to degrees for readability
-        theta2 = np.degrees(sim_data['theta2'])
+        theta1 = sim_data['theta1'] # Plotted in radians, the axis is labelled in degrees (no converted copy)
+        theta2 = sim_data['theta2']
         omega1 = sim_data['omega1']
         omega2 = sim_data['omega2']
         alpha1 = sim_data['alpha1']
         alpha2 = sim_data['alpha2']
 
         # Plot 1: Joint Angles
-        ax1.clear() # Clear existing content if redrawing
-        ax1.plot(time, theta1, label=r'$\theta_1$ (Link 1 Angle)')
-        ax1.plot(time, theta2, label=r'$\theta_2$ (Link 2 Angle)')
+        lines = {}
+        lines['theta1'], = ax1.plot(time, theta1, label=r'$\theta_1$ (Link 1 Angle)')
+        lines['theta2'], = ax1.plot(time, theta2, label=r'$\theta_2$ (Link 2 Angle)')
         ax1.set_xlabel("Time (s)")
         ax1.set_ylabel("Angle (degrees)")
+        ax1.yaxis.set_major_locator(_DegreeLocator(nbins='auto', steps=[1, 2, 2.5, 5, 10])) # Same steps as the default locator
+        ax1.yaxis.set_major_formatter(FuncFormatter(lambda v, _: f"{math.degrees(v):.0f}"))
         ax1.set_title("Joint Angles vs. Time")
         ax1.legend()
         ax1.grid(True)
         logger.debug("Joint Angles plot generated successfully.")
 
         # Plot 2: Angular Velocities
-        ax2.clear()
-        ax2.plot(time, omega1, label=r'$\omega_1$ (Link 1 Angular Velocity)')
-        ax2.plot(time, omega2, label=r'$\omega_2$ (Link 2 Angular Velocity)')
+        lines['omega1'], = ax2.plot(time, omega1, label=r'$\omega_1$ (Link 1 Angular Velocity)')
+        lines['omega2'], = ax2.plot(time, omega2, label=r'$\omega_2$ (Link 2 Angular Velocity)')
         ax2.set_xlabel("Time (s)")
         ax2.set_ylabel("Angular Velocity (rad/s)")
         ax2.set_title("Joint Angular Velocities vs. Time")
@@ -55,9 +69,8 @@ def plot_sim_data_on_axes(sim_data: dict, ax1, ax2, ax3):
         logger.debug("Angular Velocities plot generated successfully.")
 
         # Plot 3: Angular Accelerations
-        ax3.clear()
-        ax3.plot(time, alpha1, label=r'$\alpha_1$ (Link 1 Angular Acceleration)')
-        ax3.plot(time, alpha2, label=r'$\alpha_2$ (Link 2 Angular Acceleration)')
+        lines['alpha1'], = ax3.plot(time, alpha1, label=r'$\alpha_1$ (Link 1 Angular Acceleration)')
+        lines['alpha2'], = ax3.plot(time, alpha2, label=r'$\alpha_2$ (Link 2 Angular Acceleration)')
         ax3.set_xlabel("Time (s)")
         ax3.set_ylabel("Angular Acceleration (rad/s^2)")
         ax3.set_title("Joint Angular Accelerations vs. Time")
@@ -66,8 +79,33 @@ def plot_sim_data_on_axes(sim_data: dict, ax1, ax2, ax3):
         logger.debug("Angular Accelerations plot generated successfully.")
         
         logger.info("All static plots successfully prepared on axes.")
+        return lines
 
     except Exception as e:
-        logger.error(f"Error encountered during plotting on axes: {e}", exc_info=True)
+        logger.error("Error encountered during plotting on axes: %s", e, exc_info=True)
         # Re-raise the exception so the calling GUI function can handle the display of an error message.
-        raise
\ No newline at end of file
+        raise
+
+def update_sim_data_lines(lines: dict, sim_data: SimResult):
+    """
+    Points the lines created by plot_sim_data_on_axes at new simulation data
+    and rescales their axes, without rebuilding any artists.
+
+    Args:
+        lines (dict): Line2D artists keyed by sim_data column, as returned by plot_sim_data_on_axes.
+        sim_data (SimResult): The new simulation data.
+    """
+    logger.info("Updating static plots with new simulation data.")
+    try:
+        time = sim_data['time']
+        for name, line in lines.items():
+            line.set_data(time, sim_data[name])
+
+        for ax in {line.axes for line in lines.values()}:
+            ax.relim()
+            ax.autoscale_view()
+        logger.info("Static plots updated.")
+
+    except Exception as e:
+        logger.error("Error encountered while updating plots: %s", e, exc_info=True)
+        raise
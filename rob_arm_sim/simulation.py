@@ -1,18 +1,81 @@
 # rob_arm_sim/simulation.py
+import math
 import numpy as np
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from .arm import RobotArm, OutOfReachError
+from ._kernels import (HAVE_NUMBA, PARALLEL_MIN_POINTS, circle_points, first_unreachable,
+                       path_kinematics, path_kinematics_parallel)
 
 logger = logging.getLogger(__name__) # Get logger for this module
 
+# Column layout of the simulation data array, one row per time step
+SIM_COLUMNS = (
+    'time',
+    'theta1', 'theta2',
+    'omega1', 'omega2',
+    'alpha1', 'alpha2',
+    'end_effector_x', 'end_effector_y',
+    'joint_x', 'joint_y',
+)
+COL = {name: i for i, name in enumerate(SIM_COLUMNS)}
+
+# Adjacent column pairs, so both joints are processed in one operation
+THETA_COLS = slice(COL['theta1'], COL['theta2'] + 1)
+OMEGA_COLS = slice(COL['omega1'], COL['omega2'] + 1)
+ALPHA_COLS = slice(COL['alpha1'], COL['alpha2'] + 1)
+
+
+class SimResult:
+    """
+    Simulation data stored in a single contiguous (N, C) array with the columns in SIM_COLUMNS.
+
+    Columns are looked up by name like a dict, e.g. sim_data['theta1'], or as attributes, e.g. sim_data.theta1,
+    and are returned as views, so no data is copied. Like a dict, iterating or calling keys() gives the column names.
+    """
+
+    columns = SIM_COLUMNS
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.data[:, COL[name]]
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Only reached for names that are not regular attributes
+        if name in COL:
+            return self.data[:, COL[name]]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    # Without these, `in` and iteration would fall back to __getitem__ with integer indices
+    def __iter__(self):
+        return iter(SIM_COLUMNS)
+
+    def __contains__(self, name) -> bool:
+        return name in COL
+
+    def keys(self) -> tuple[str, ...]:
+        return SIM_COLUMNS
+
+    def astype(self, dtype) -> 'SimResult':
+        """Returns a copy of the simulation data converted to the given dtype."""
+        return SimResult(self.data.astype(dtype))
+
+
 def simulate_circular_path(
     arm: RobotArm,
     circle_center_x: float,
     circle_center_y: float,
     circle_radius: float,
     speed_v: float,
-    dt: float
-) -> dict:
+    dt: float,
+    dtype=np.float64
+) -> SimResult:
     """
     Simulates the robotic arm tracing a circular path.
 
@@ -22,121 +85,164 @@ def simulate_circular_path(
         circle_center_y (float): Y-coordinate of the circle's center.
         circle_radius (float): Radius of the circle.
         speed_v (float): Desired speed of the end effector along the circle.
-        dt (float): Time step for the simulation.
+        dt (float): Time step for the simulation. One lap is split into whole steps, so the actual step may be slightly smaller.
+        dtype: dtype of the returned data, e.g. np.float32 for display-only use. The kinematics and
+            derivatives are always computed in float64 and only stored at this precision.
 
     Returns:
-        dict: A dictionary containing simulation data (time, angles, velocities, accelerations, end effector positions).
+        SimResult: The simulation data (time, angles, velocities, accelerations, joint and end effector positions).
 
     Raises:
         OutOfReachError: If any point on the circle is unreachable by the arm.
+
+    Repeating the previous call with the same arm geometry and parameters returns its result again, so
+    the data arrays are shared between those calls and read-only.
     """
-    logger.info(f"Starting simulation for circular path. Center=({circle_center_x},{circle_center_y}), Radius={circle_radius}, Speed={speed_v}, dt={dt}")
+    global _last_simulation
+    # Keyed on plain values rather than the arm object, so a changed arm geometry is a different simulation
+    key = (arm.L1, arm.L2, arm.base_x, arm.base_y, circle_center_x, circle_center_y,
+           circle_radius, speed_v, dt, np.dtype(dtype))
+    if _last_simulation is not None and _last_simulation[0] == key:
+        logger.info("Reusing the previous simulation result for identical parameters.")
+        return SimResult(_last_simulation[1])
+
+    sim_data = _simulate_circular_path(arm, circle_center_x, circle_center_y, circle_radius, speed_v, dt, dtype)
+    sim_data.setflags(write=False) # Shared by every caller that repeats this run
+    _last_simulation = (key, sim_data)
+    return SimResult(sim_data)
+
+
+# (key, data) of the most recent simulation; only one result is kept, so at most one lap's data stays pinned
+_last_simulation = None
+
+
+def clear_simulation_cache() -> None:
+    """Forgets the kept result of the most recent simulation."""
+    global _last_simulation
+    _last_simulation = None
+
+
+def _simulate_circular_path(arm: RobotArm, circle_center_x: float, circle_center_y: float, circle_radius: float,
+                            speed_v: float, dt: float, dtype) -> np.ndarray:
+    """Runs the simulation documented in simulate_circular_path, returning the raw (N, C) data array."""
+    logger.info("Starting simulation for circular path. Center=(%s,%s), Radius=%s, Speed=%s, dt=%s", circle_center_x, circle_center_y, circle_radius, speed_v, dt)
 
     circumference = 2 * np.pi * circle_radius
     total_time = circumference / speed_v
-    num_steps = int(total_time / dt)
+    # Split one lap into a whole number of steps no longer than dt
+    num_steps = int(np.ceil(total_time / dt))
     
-    if num_steps <= 1: # Ensure at least 2 steps for velocity/acceleration calculation
-        logger.warning(f"Number of simulation steps ({num_steps}) too low. Adjusting total_time to ensure at least 2 steps for meaningful data.")
-        num_steps = 2
-        total_time = (num_steps - 1) * dt
+    if num_steps < 3: # Ensure at least 3 steps for the second order velocity/acceleration stencils
+        logger.warning("Number of simulation steps (%d) too low. Using 3 steps for meaningful data.", num_steps)
+        num_steps = 3
         
-    time_points = np.linspace(0, total_time, num_steps)
-    logger.debug(f"Simulation will run for {total_time:.2f}s over {num_steps} steps.")
-
-    theta1_data = []
-    theta2_data = []
-    omega1_data = [0.0] # Initial angular velocities
-    omega2_data = [0.0]
-    alpha1_data = [0.0] # Initial angular accelerations
-    alpha2_data = [0.0]
-    end_effector_x_data = []
-    end_effector_y_data = []
-
-    # Calculate initial position
-    initial_angle = 0 # Start at (a + r, b)
-    target_x_init = circle_center_x + circle_radius * np.cos(initial_angle)
-    target_y_init = circle_center_y + circle_radius * np.sin(initial_angle)
-    
-    # Check reachability of the first point
-    if not arm.is_reachable(target_x_init, target_y_init):
-        logger.error(f"Initial point ({target_x_init:.2f},{target_y_init:.2f}) on circle is unreachable.")
-        raise OutOfReachError(f"Initial point ({target_x_init:.2f}, {target_y_init:.2f}) is out of arm's reach.")
-
-    try:
-        theta1_prev, theta2_prev = arm.inv_kinematics(target_x_init, target_y_init)
-    except OutOfReachError as e:
-        logger.error(f"IK failed for initial point: {e}")
-        raise # Re-raise the error to be caught by the GUI
-
-    theta1_data.append(theta1_prev)
-    theta2_data.append(theta2_prev)
-    ee_x_curr, ee_y_curr = arm.forward_kinematics(theta1_prev, theta2_prev)
-    end_effector_x_data.append(ee_x_curr)
-    end_effector_y_data.append(ee_y_curr)
-    logger.debug(f"Initial arm configuration: theta1={np.degrees(theta1_prev):.2f}deg, theta2={np.degrees(theta2_prev):.2f}deg at ({ee_x_curr:.2f},{ee_y_curr:.2f})")
-
-
-    # Simulate path
-    for i in range(1, num_steps):
-        t_curr = time_points[i]
-        angle_on_circle = (speed_v * t_curr) / circle_radius # Current angle based on arc length
-        
-        # Normalize angle to be within -pi to pi for consistent kinematics if needed,
-        # but for continuous path, just let it increase.
-        
-        target_x = circle_center_x + circle_radius * np.cos(angle_on_circle)
-        target_y = circle_center_y + circle_radius * np.sin(angle_on_circle)
-        
-        # Check reachability before attempting IK
-        if not arm.is_reachable(target_x, target_y):
-            logger.error(f"Point ({target_x:.2f},{target_y:.2f}) at time {t_curr:.2f}s is unreachable.")
-            raise OutOfReachError(f"Point ({target_x:.2f}, {target_y:.2f}) at time {t_curr:.2f}s is out of arm's reach.")
-
-        try:
-            theta1_curr, theta2_curr = arm.inv_kinematics(target_x, target_y)
-        except OutOfReachError as e: # This should ideally not be hit if is_reachable is correctly used
-            logger.error(f"IK failed unexpectedly for point ({target_x:.2f},{target_y:.2f}) at time {t_curr:.2f}s: {e}")
-            raise # Re-raise the error to be caught by the GUI
-            
-        theta1_data.append(theta1_curr)
-        theta2_data.append(theta2_curr)
-
-        # Calculate angular velocities and accelerations
-        dt_val = time_points[i] - time_points[i-1]
-        
-        # Fallback for dt_val if for some reason it's zero or negative
-        if dt_val <= 0: 
-            logger.warning(f"Calculated dt_val is non-positive ({dt_val:.4f}) at step {i}. Using provided dt ({dt}). This might indicate an issue with time_points generation.")
-            dt_val = dt
-
-        omega1_curr = (theta1_curr - theta1_prev) / dt_val
-        omega2_curr = (theta2_curr - theta2_prev) / dt_val
-        omega1_data.append(omega1_curr)
-        omega2_data.append(omega2_curr)
-
-        # Ensure we have enough previous data for acceleration calculation
-        alpha1_curr = (omega1_curr - omega1_data[-2]) / dt_val if len(omega1_data) > 1 else 0.0
-        alpha2_curr = (omega2_curr - omega2_data[-2]) / dt_val if len(omega2_data) > 1 else 0.0
-        alpha1_data.append(alpha1_curr)
-        alpha2_data.append(alpha2_curr)
-        
-        ee_x_curr, ee_y_curr = arm.forward_kinematics(theta1_curr, theta2_curr)
-        end_effector_x_data.append(ee_x_curr)
-        end_effector_y_data.append(ee_y_curr)
-
-        theta1_prev, theta2_prev = theta1_curr, theta2_curr
-        logger.debug(f"Step {i}: t={t_curr:.2f}s, EE=({ee_x_curr:.2f},{ee_y_curr:.2f}), th1={np.degrees(theta1_curr):.2f}deg, th2={np.degrees(theta2_curr):.2f}deg")
-
-    logger.info(f"Simulation completed for {len(time_points)} steps. Total time: {time_points[-1]:.2f}s.")
-    return {
-        'time': np.array(time_points),
-        'theta1': np.array(theta1_data),
-        'theta2': np.array(theta2_data),
-        'omega1': np.array(omega1_data),
-        'omega2': np.array(omega2_data),
-        'alpha1': np.array(alpha1_data),
-        'alpha2': np.array(alpha2_data),
-        'end_effector_x': np.array(end_effector_x_data),
-        'end_effector_y': np.array(end_effector_y_data)
-    }
\ No newline at end of file
+    # Uniform by construction; the lap closes on the first sample instead of repeating it, so the path loops seamlessly
+    dt_val = total_time / num_steps
+    time_points = np.arange(num_steps) * dt_val
+    logger.debug("Simulation will run for %.2fs over %d steps.", total_time, num_steps)
+
+    # Sample the whole circle at once; the angle on the circle follows from the arc length travelled
+    angular_speed = speed_v / circle_radius
+    angles = angular_speed * time_points
+    if HAVE_NUMBA:
+        # One fused pass over the angles for both coordinates
+        target_x = np.empty(num_steps)
+        target_y = np.empty(num_steps)
+        circle_points(circle_center_x, circle_center_y, circle_radius, angles, target_x, target_y)
+    else:
+        # Targets are scaled and offset in place, and the angle buffer is reused for the sine
+        target_x = np.cos(angles)
+        target_x *= circle_radius
+        target_x += circle_center_x
+        target_y = np.sin(angles, out=angles)
+        target_y *= circle_radius
+        target_y += circle_center_y
+
+    # Fail fast: the whole circle is checked in one pass before any IK work or allocation is done
+    i = _first_unreachable(arm, target_x, target_y)
+    if i >= 0:
+        message = f"Target point ({target_x[i]: .2f}, {target_y[i]: .2f}) at t={time_points[i]:.2f}s is out of arm's reach"
+        logger.error("Circular path is not fully reachable: %s", message)
+        raise OutOfReachError(message) # Caught by the GUI
+
+    # Every result is written straight into its column of one preallocated array, with no intermediate copies
+    sim_data = np.empty((num_steps, len(SIM_COLUMNS)), dtype=dtype)
+    sim_data[:, COL['time']] = time_points
+    # The angles are differentiated twice, which float32 rounding would swamp, so they are solved in float64 regardless
+    theta = sim_data[:, THETA_COLS] if sim_data.dtype == np.float64 else np.empty((num_steps, 2))
+
+    _solve_path(arm, target_x, target_y, theta, sim_data)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Initial arm configuration: theta1=%.2fdeg, theta2=%.2fdeg", math.degrees(theta[0, 0]), math.degrees(theta[0, 1]))
+
+    # atan2 wraps theta1 at +-pi when the path circles the base; unwrap so the angles, and their derivatives, stay continuous
+    theta = np.unwrap(theta, axis=0)
+    sim_data[:, THETA_COLS] = theta
+
+    # Central differences for both joints at once (second order at the ends too); samples are evenly spaced
+    omega = np.gradient(theta, dt_val, axis=0, edge_order=2)
+    sim_data[:, OMEGA_COLS] = omega
+    sim_data[:, ALPHA_COLS] = np.gradient(omega, dt_val, axis=0, edge_order=2)
+
+    logger.info("Simulation completed for %d steps. Total time: %.2fs.", num_steps, time_points[-1])
+    return sim_data
+
+
+def simulate_circular_paths(
+    arm: RobotArm,
+    circles: list[tuple[float, float, float, float]],
+    dt: float,
+    processes: int = 1
+) -> list[SimResult]:
+    """
+    Simulates the robotic arm tracing several circular paths, optionally in parallel worker processes.
+
+    Args:
+        arm (RobotArm): The RobotArm instance, sent to each worker process.
+        circles (list[tuple[float, float, float, float]]): (circle_center_x, circle_center_y, circle_radius, speed_v) per path.
+        dt (float): Time step for the simulation.
+        processes (int): Number of worker processes; 1 runs every path in this process, None uses one per CPU.
+
+    Returns:
+        list[SimResult]: The simulation data of each circle, in the same order.
+
+    Raises:
+        OutOfReachError: If any point on any of the circles is unreachable by the arm.
+    """
+    simulate = partial(simulate_circular_path, arm, dt=dt)
+    if processes == 1 or len(circles) <= 1:
+        return [simulate(*circle) for circle in circles]
+
+    logger.info("Simulating %d circular paths in parallel.", len(circles))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(simulate, *zip(*circles)))
+
+
+def _first_unreachable(arm: RobotArm, target_x: np.ndarray, target_y: np.ndarray) -> int:
+    """
+    Returns the index of the first target point outside the arm's reach, or -1 if every point is reachable.
+    Uses the numba kernel when numba is installed, otherwise the arm's vectorised check, which the IK shares.
+    """
+    if HAVE_NUMBA:
+        return first_unreachable(arm.L1, arm.L2, arm.base_x, arm.base_y, target_x, target_y)
+    return arm.first_unreachable_batch(target_x, target_y)
+
+
+def _solve_path(arm: RobotArm, target_x: np.ndarray, target_y: np.ndarray, theta: np.ndarray, sim_data: np.ndarray) -> None:
+    """
+    Fills the (N, 2) theta array and the joint and end effector columns of sim_data for every target point.
+    Uses the fused numba kernel when numba is installed, otherwise the vectorised NumPy kinematics.
+    Every target point must already be known to be reachable.
+    """
+    theta_out = (theta[:, 0], theta[:, 1])
+    # Joint and end effector positions for every step, so consumers only need to index them
+    position_out = (sim_data[:, COL['joint_x']], sim_data[:, COL['joint_y']],
+                    sim_data[:, COL['end_effector_x']], sim_data[:, COL['end_effector_y']])
+
+    if not HAVE_NUMBA:
+        arm.inv_kinematics_batch(target_x, target_y, out=theta_out)
+        arm.forward_kinematics_batch(*theta_out, out=position_out)
+        return
+
+    kernel = path_kinematics_parallel if len(target_x) >= PARALLEL_MIN_POINTS else path_kinematics
+    kernel(arm.L1, arm.L2, arm.base_x, arm.base_y, target_x, target_y, *theta_out, *position_out)
@@ -0,0 +1,132 @@
+# rob_arm_sim/simulation_jax.py
+"""
+JAX version of the circular path simulation, for sweeping many circles in one compiled call.
+
+Requires the optional jax extra (pip install -e .[jax]). JAX defaults to float32, in which the twice differentiated
+angles are mostly rounding noise, so simulate_circular_paths_jax runs with JAX's 64-bit mode switched on and returns
+float64 data like simulate_circular_path.
+"""
+import logging
+from functools import partial
+import numpy as np
+from .arm import RobotArm, OutOfReachError, _beyond_reach, _cos_theta2
+from ._kernels import REACH_TOLERANCE
+from .simulation import SimResult
+
+try:
+    import jax
+    import jax.numpy as jnp
+except ImportError as e:
+    raise ImportError("rob_arm_sim.simulation_jax needs JAX, install it with: pip install -e .[jax]") from e
+
+try:
+    from jax import enable_x64 as _enable_x64
+except ImportError: # Older JAX only has the experimental context manager
+    from jax.experimental import enable_x64 as _enable_x64
+
+logger = logging.getLogger(__name__) # Get logger for this module
+
+
+def _gradient(f, h):
+    """Second order finite differences, matching np.gradient(f, h, edge_order=2)"""
+    first = (-3 * f[0] + 4 * f[1] - f[2]) / (2 * h)
+    interior = (f[2:] - f[:-2]) / (2 * h)
+    last = (3 * f[-1] - 4 * f[-2] + f[-3]) / (2 * h)
+    return jnp.concatenate([first[None], interior, last[None]])
+
+
+def _simulate(L1, L2, base_x, base_y, circle_center_x, circle_center_y, circle_radius, speed_v, num_steps):
+    """
+    One lap of a single circle in num_steps samples, with the same kinematics as simulate_circular_path
+
+    Returns:
+        tuple: (data, reachable), data being the (num_steps, C) array in SIM_COLUMNS order and
+        reachable whether every point on the circle is within the arm's reach
+    """
+    total_time = 2 * jnp.pi * circle_radius / speed_v
+    dt_val = total_time / num_steps
+    time_points = jnp.arange(num_steps) * dt_val
+
+    angles = (speed_v / circle_radius) * time_points
+    dx = circle_center_x + circle_radius * jnp.cos(angles) - base_x
+    dy = circle_center_y + circle_radius * jnp.sin(angles) - base_y
+
+    # No exceptions inside a compiled function, so reachability is returned alongside the data
+    cos_theta2 = _cos_theta2(dx, dy, L1, L2)
+    # (in float32 the rounding slack has to grow with the machine epsilon)
+    tolerance = max(REACH_TOLERANCE, 4 * float(jnp.finfo(cos_theta2.dtype).eps))
+    reachable = ~jnp.any(_beyond_reach(cos_theta2, tolerance))
+    cos_theta2 = jnp.clip(cos_theta2, -1.0, 1.0)
+    sin_theta2 = jnp.sqrt(1.0 - cos_theta2*cos_theta2)
+
+    theta2 = jnp.arccos(cos_theta2)
+    theta1 = jnp.unwrap(jnp.arctan2(dy, dx) - jnp.arctan2(L2 * sin_theta2, L1 + L2 * cos_theta2))
+
+    omega1 = _gradient(theta1, dt_val)
+    omega2 = _gradient(theta2, dt_val)
+    alpha1 = _gradient(omega1, dt_val)
+    alpha2 = _gradient(omega2, dt_val)
+
+    joint_x = base_x + L1 * jnp.cos(theta1)
+    joint_y = base_y + L1 * jnp.sin(theta1)
+    end_effector_x = joint_x + L2 * jnp.cos(theta1 + theta2)
+    end_effector_y = joint_y + L2 * jnp.sin(theta1 + theta2)
+
+    data = jnp.stack([time_points, theta1, theta2, omega1, omega2, alpha1, alpha2,
+                      end_effector_x, end_effector_y, joint_x, joint_y], axis=-1)
+    return data, reachable
+
+
+@partial(jax.jit, static_argnames=('num_steps',))
+def simulate_many(L1, L2, base_x, base_y, circle_center_x, circle_center_y, circle_radius, speed_v, num_steps):
+    """
+    Simulates one lap of every circle at once, vectorised over the circle parameter arrays with jax.vmap
+
+    Computes in float32 unless JAX's x64 mode is on; simulate_circular_paths_jax switches it on for its call.
+
+    Returns:
+        tuple: (data, reachable) with shapes (B, num_steps, C) and (B,)
+    """
+    circle_sim = partial(_simulate, L1, L2, base_x, base_y, num_steps=num_steps)
+    return jax.vmap(circle_sim)(circle_center_x, circle_center_y, circle_radius, speed_v)
+
+
+def simulate_circular_paths_jax(
+    arm: RobotArm,
+    circles: list[tuple[float, float, float, float]],
+    dt: float
+) -> list[SimResult]:
+    """
+    Simulates the robotic arm tracing several circular paths in one JIT-compiled call.
+
+    Every circle is sampled with the same number of steps, chosen so that no step of the longest lap exceeds dt.
+
+    Args:
+        arm (RobotArm): The RobotArm instance.
+        circles (list[tuple[float, float, float, float]]): (circle_center_x, circle_center_y, circle_radius, speed_v) per path.
+        dt (float): Maximum time step for the simulation.
+
+    Returns:
+        list[SimResult]: The simulation data of each circle, in the same order.
+
+    Raises:
+        OutOfReachError: If any point on any of the circles is unreachable by the arm.
+    """
+    circle_center_x, circle_center_y, circle_radius, speed_v = (np.asarray(p, dtype=float) for p in zip(*circles))
+    longest_lap = np.max(2 * np.pi * circle_radius / speed_v)
+    num_steps = max(3, int(np.ceil(longest_lap / dt)))
+    logger.info("Starting JAX simulation of %d circular paths over %d steps each.", len(circles), num_steps)
+
+    # float64 throughout, the accelerations being second differences of the angles (see simulate_circular_path)
+    with _enable_x64(True):
+        data, reachable = simulate_many(arm.L1, arm.L2, arm.base_x, arm.base_y,
+                                        circle_center_x, circle_center_y, circle_radius, speed_v, num_steps=num_steps)
+        data = np.asarray(data)
+        reachable = np.asarray(reachable)
+    if not reachable.all():
+        i = int(np.argmin(reachable))
+        logger.error("Circle %d is not fully reachable by the arm.", i)
+        raise OutOfReachError(f"Circle {i} (center=({circle_center_x[i]: .2f}, {circle_center_y[i]: .2f}), radius={circle_radius[i]: .2f}) is out of arm's reach")
+
+    logger.info("JAX simulation completed for %d circular paths.", len(circles))
+    return [SimResult(data[i]) for i in range(len(circles))]
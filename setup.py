@@ -27,6 +27,10 @@ setup(
         'matplotlib>=3.3',
         'PyQt5>=5.15',
     ],
+    extras_require={
+        'numba': ['numba>=0.56'], # Optional: JIT-compiles the kinematics kernels
+        'jax': ['jax>=0.4'], # Optional: batched circle sweeps in rob_arm_sim.simulation_jax
+    },
     entry_points={
         'gui_scripts': [
             'rob_arm_sim_gui=gui_app:main', # Allows running the GUI via a command
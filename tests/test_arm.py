@@ -66,4 +66,121 @@ def test_inverse_kinematics_unreachable():
     with pytest.raises(OutOfReachError):
         arm.inv_kinematics(200, 0) # Too far
     with pytest.raises(OutOfReachError):
-        arm.inv_kinematics(10, 0) # Too close    
\ No newline at end of file
+        arm.inv_kinematics(10, 0) # Too close    
+
+def test_forward_kinematics_batch_matches_scalar():
+    arm = RobotArm(L1=100, L2=80, base_x=10, base_y=-5)
+    theta1 = np.linspace(-np.pi, np.pi, 7)
+    theta2 = np.linspace(0, np.pi, 7)
+    jx, jy, ex, ey = arm.forward_kinematics_batch(theta1, theta2)
+    for i in range(len(theta1)):
+        exp_jx, exp_jy, exp_ex, exp_ey = arm.get_joint_positions(theta1[i], theta2[i])
+        assert np.isclose(jx[i], exp_jx)
+        assert np.isclose(jy[i], exp_jy)
+        assert np.isclose(ex[i], exp_ex)
+        assert np.isclose(ey[i], exp_ey)
+
+def test_get_joint_positions_matches_forward_kinematics():
+    arm = RobotArm(L1=100, L2=80, base_x=10, base_y=-5)
+    jx, jy, ex, ey = arm.get_joint_positions(np.pi / 3, -np.pi / 4)
+    assert np.isclose(jx, 10 + 100 * np.cos(np.pi / 3))
+    assert np.isclose(jy, -5 + 100 * np.sin(np.pi / 3))
+    fx, fy = arm.forward_kinematics(np.pi / 3, -np.pi / 4)
+    assert np.isclose(ex, fx)
+    assert np.isclose(ey, fy)
+
+def test_inverse_kinematics_target_at_base_equal_links():
+    arm = RobotArm(L1=100, L2=100, base_x=0, base_y=0)
+    theta1, theta2 = arm.inv_kinematics(0, 0)
+    fx, fy = arm.forward_kinematics(theta1, theta2)
+    assert np.isclose(fx, 0)
+    assert np.isclose(fy, 0)
+
+def test_inverse_kinematics_batch_matches_scalar():
+    arm = RobotArm(L1=100, L2=80, base_x=10, base_y=-5)
+    target_x = np.array([190, 130, 30, -60, 10])
+    target_y = np.array([-5, 45, -5, 70, -130])
+    theta1, theta2 = arm.inv_kinematics_batch(target_x, target_y)
+    for i in range(len(target_x)):
+        exp_theta1, exp_theta2 = arm.inv_kinematics(target_x[i], target_y[i])
+        assert np.isclose(theta1[i], exp_theta1)
+        assert np.isclose(theta2[i], exp_theta2)
+
+def test_inverse_kinematics_batch_unreachable():
+    arm = RobotArm(L1=100, L2=80, base_x=0, base_y=0)
+    with pytest.raises(OutOfReachError):
+        arm.inv_kinematics_batch(np.array([150, 200]), np.array([0, 0])) # Second point too far
+    with pytest.raises(OutOfReachError):
+        arm.inv_kinematics_batch(np.array([10, 150]), np.array([0, 0])) # First point too close
+
+def test_kinematics_cache_tracks_arm_geometry():
+    arm = RobotArm(L1=100, L2=80, base_x=0, base_y=0)
+    assert np.isclose(arm.forward_kinematics(0, 0)[0], 180)
+    arm.base_x = 10 # Same angles on a moved arm must not hit the cached result
+    assert np.isclose(arm.forward_kinematics(0, 0)[0], 190)
+    theta1, theta2 = arm.inv_kinematics(190, 0)
+    assert np.isclose(theta1, 0)
+    assert np.isclose(theta2, 0)
+
+def test_batch_kinematics_write_into_out_arrays():
+    arm = RobotArm(L1=100, L2=80, base_x=10, base_y=-5)
+    target_x = np.array([190.0, 130.0, -60.0])
+    target_y = np.array([-5.0, 45.0, 70.0])
+    buf = np.empty((6, 3))
+    theta1, theta2 = arm.inv_kinematics_batch(target_x, target_y, out=(buf[0], buf[1]))
+    assert np.shares_memory(theta1, buf[0]) and np.shares_memory(theta2, buf[1])
+    arm.forward_kinematics_batch(buf[0], buf[1], out=tuple(buf[2:]))
+    assert np.allclose(buf[4], target_x)
+    assert np.allclose(buf[5], target_y)
+
+def test_inverse_kinematics_batch_accepts_reach_boundary():
+    arm = RobotArm(L1=100, L2=80, base_x=0, base_y=0)
+    angles = np.linspace(0, 2 * np.pi, 1000)
+    # Rounding puts some of these points a hair outside the exact max reach
+    theta1, theta2 = arm.inv_kinematics_batch(180 * np.cos(angles), 180 * np.sin(angles))
+    assert np.allclose(theta2, 0, atol=1e-6)
+    assert np.allclose(np.cos(theta1), np.cos(angles))
+    # The scalar API draws the reach boundary in the same place
+    for target_x, target_y in zip(180 * np.cos(angles), 180 * np.sin(angles)):
+        assert arm.is_reachable(target_x, target_y)
+        assert np.isclose(arm.inv_kinematics(target_x, target_y)[1], 0, atol=1e-6)
+
+def test_inverse_kinematics_batch_resized_link():
+    arm = RobotArm(L1=100, L2=80, base_x=0, base_y=0)
+    arm.L2 = 50 # Link lengths are plain attributes, so a resize applies to the next solve
+    theta1, theta2 = arm.inv_kinematics_batch(np.array([150.0, 100.0]), np.array([0.0, 40.0]))
+    _, _, ex, ey = arm.forward_kinematics_batch(theta1, theta2)
+    assert np.allclose(ex, [150, 100])
+    assert np.allclose(ey, [0, 40])
+
+def test_inverse_kinematics_batch_scalar_targets():
+    arm = RobotArm(L1=100, L2=80, base_x=10, base_y=-5)
+    exp_theta1, exp_theta2 = arm.inv_kinematics(150.0, 0.0)
+    for target_x, target_y in ((150.0, 0.0), (np.asarray(150.0), np.asarray(0.0))):
+        theta1, theta2 = arm.inv_kinematics_batch(target_x, target_y)
+        assert np.shape(theta1) == () and np.shape(theta2) == ()
+        assert np.isclose(theta1, exp_theta1)
+        assert np.isclose(theta2, exp_theta2)
+    with pytest.raises(OutOfReachError):
+        arm.inv_kinematics_batch(300.0, 0.0)
+
+def test_inverse_kinematics_batch_broadcast_targets():
+    arm = RobotArm(L1=100, L2=80, base_x=0, base_y=0)
+    theta1, theta2 = arm.inv_kinematics_batch(100.0, np.array([0.0, 40.0]))
+    assert theta1.shape == theta2.shape == (2,)
+    for i, target_y in enumerate((0.0, 40.0)):
+        exp_theta1, exp_theta2 = arm.inv_kinematics(100.0, target_y)
+        assert np.isclose(theta1[i], exp_theta1)
+        assert np.isclose(theta2[i], exp_theta2)
+    with pytest.raises(OutOfReachError, match=r"\( 150.00,  100.00\)"): # The bad point, not its broadcast neighbour
+        arm.inv_kinematics_batch(150.0, np.array([0.0, 100.0]))
+
+def test_first_unreachable_batch_matches_kernel():
+    from rob_arm_sim._kernels import first_unreachable
+    arm = RobotArm(L1=100, L2=80, base_x=10, base_y=-5)
+    target_x = np.array([190.0, 130.0, 15.0, 250.0])
+    target_y = np.array([-5.0, 45.0, -5.0, 0.0])
+    assert arm.first_unreachable_batch(target_x, target_y) == 2 # Too close to the base
+    assert arm.first_unreachable_batch(target_x[:2], target_y[:2]) == -1
+    for n in (2, 3, 4):
+        assert first_unreachable(100.0, 80.0, 10.0, -5.0, target_x[:n], target_y[:n]) == arm.first_unreachable_batch(target_x[:n], target_y[:n])
@@ -0,0 +1,157 @@
+import pytest
+from rob_arm_sim.arm import RobotArm, OutOfReachError
+from rob_arm_sim.simulation import simulate_circular_path, simulate_circular_paths, SIM_COLUMNS
+import rob_arm_sim.simulation as simulation
+import numpy as np
+
+@pytest.fixture(autouse=True)
+def clear_simulation_cache():
+    # Every test starts without the previous test's simulation kept
+    simulation.clear_simulation_cache()
+
+@pytest.fixture
+def arm():
+    return RobotArm(L1=1200, L2=800, base_x=0, base_y=0)
+
+@pytest.fixture
+def circle_params():
+    return dict(circle_center_x=0, circle_center_y=1500, circle_radius=200, speed_v=100, dt=0.01)
+
+def test_simulation_traces_circle(arm, circle_params):
+    sim_data = simulate_circular_path(arm, **circle_params)
+    n = len(sim_data)
+    assert n > 2
+    for name in SIM_COLUMNS:
+        assert sim_data[name].shape == (n,)
+    assert np.allclose(sim_data['end_effector_x'], sim_data['joint_x'] + 800 * np.cos(sim_data['theta1'] + sim_data['theta2']))
+    # End effector stays on the target circle
+    dist = np.hypot(sim_data['end_effector_x'] - 0, sim_data['end_effector_y'] - 1500)
+    assert np.allclose(dist, 200)
+
+def test_simulation_uniform_speed(arm, circle_params):
+    sim_data = simulate_circular_path(arm, **circle_params)
+    step = np.hypot(np.diff(sim_data['end_effector_x']), np.diff(sim_data['end_effector_y']))
+    speed = step / np.diff(sim_data['time'])
+    assert np.allclose(speed, 100, rtol=1e-3)
+
+def test_simulation_unreachable_circle():
+    arm = RobotArm(L1=100, L2=80, base_x=0, base_y=0)
+    with pytest.raises(OutOfReachError, match=r"at t=0\.00s"):
+        simulate_circular_path(arm, circle_center_x=150, circle_center_y=0,
+                               circle_radius=50, speed_v=10, dt=0.01) # Far side of the circle is out of reach
+
+def test_simulation_samples_one_lap(arm, circle_params):
+    dt = 0.03
+    sim_data = simulate_circular_path(arm, **{**circle_params, 'dt': dt})
+    total_time = 2 * np.pi * 200 / 100
+    steps = np.diff(sim_data['time'])
+    assert len(sim_data) == int(np.ceil(total_time / dt))
+    assert np.allclose(steps, steps[0]) and steps[0] <= dt
+    # The last sample is one step short of closing the circle, not a repeat of the first
+    assert np.isclose(sim_data['time'][-1] + steps[0], total_time)
+    assert not np.isclose(sim_data['end_effector_y'][-1], sim_data['end_effector_y'][0])
+
+def test_sim_result_astype(arm, circle_params):
+    sim_data = simulate_circular_path(arm, **circle_params)
+    sim_data32 = sim_data.astype(np.float32)
+    assert sim_data32['theta1'].dtype == np.float32
+    assert sim_data['theta1'].dtype == np.float64
+    assert np.allclose(sim_data32['end_effector_y'], sim_data['end_effector_y'], rtol=1e-6)
+
+def test_sim_result_columns_are_views(arm, circle_params):
+    sim_data = simulate_circular_path(arm, **circle_params)
+    assert sim_data.columns == SIM_COLUMNS
+    assert sim_data.data.shape == (len(sim_data), len(SIM_COLUMNS))
+    assert np.shares_memory(sim_data.theta1, sim_data.data)
+    assert np.array_equal(sim_data.end_effector_x, sim_data['end_effector_x'])
+    with pytest.raises(AttributeError):
+        sim_data.not_a_column
+
+def test_sim_result_iterates_column_names(arm, circle_params):
+    sim_data = simulate_circular_path(arm, **circle_params)
+    assert list(sim_data) == list(sim_data.keys()) == list(SIM_COLUMNS)
+    assert 'theta1' in sim_data
+    assert 'not_a_column' not in sim_data
+    assert all(np.array_equal(column, sim_data[name]) for name, column in dict(sim_data).items())
+
+def test_simulation_joint_velocities_match_path_speed(arm, circle_params):
+    sim_data = simulate_circular_path(arm, **circle_params)
+    theta1, theta12 = sim_data['theta1'], sim_data['theta1'] + sim_data['theta2']
+    omega1, omega12 = sim_data['omega1'], sim_data['omega1'] + sim_data['omega2']
+    # End effector velocity from the arm's Jacobian, including the first and last samples
+    vx = -1200 * np.sin(theta1) * omega1 - 800 * np.sin(theta12) * omega12
+    vy = 1200 * np.cos(theta1) * omega1 + 800 * np.cos(theta12) * omega12
+    assert np.allclose(np.hypot(vx, vy), 100, rtol=1e-3)
+
+def test_simulation_numpy_fallback_matches(arm, circle_params, monkeypatch):
+    sim_data = simulate_circular_path(arm, **circle_params)
+    monkeypatch.setattr(simulation, 'HAVE_NUMBA', False)
+    fallback = simulation._simulate_circular_path(arm, **circle_params, dtype=np.float64) # Past the kept result
+    assert np.allclose(sim_data.data, fallback)
+    with pytest.raises(OutOfReachError):
+        simulate_circular_path(arm, circle_center_x=0, circle_center_y=1900, circle_radius=200, speed_v=100, dt=0.01)
+
+def test_simulation_angles_continuous_around_base(arm):
+    # Circle around the base, so the first link turns through a full revolution
+    sim_data = simulate_circular_path(arm, circle_center_x=300, circle_center_y=0,
+                                      circle_radius=1000, speed_v=500, dt=0.01)
+    assert np.max(np.abs(np.diff(sim_data['theta1']))) < 0.1
+    assert np.isclose(sim_data['theta1'][-1] - sim_data['theta1'][0], 2 * np.pi, atol=0.1)
+    assert np.max(np.abs(sim_data['omega1'])) < 2
+
+def test_simulation_coarse_time_step(arm, circle_params):
+    # dt longer than the whole lap still gives enough samples to differentiate
+    sim_data = simulate_circular_path(arm, **{**circle_params, 'dt': 100})
+    assert len(sim_data) == 3
+    assert np.all(np.isfinite(sim_data.data))
+
+def test_simulate_circular_paths_parallel(arm):
+    circles = [(0, 1500, 200, 100), (300, 0, 1000, 500), (-800, 400, 300, 250)]
+    serial = simulate_circular_paths(arm, circles, dt=0.01)
+    parallel = simulate_circular_paths(arm, circles, dt=0.01, processes=2)
+    assert len(parallel) == len(circles)
+    for s, p, (cx, cy, r, v) in zip(serial, parallel, circles):
+        assert np.array_equal(s.data, p.data)
+        assert np.allclose(np.hypot(p['end_effector_x'] - cx, p['end_effector_y'] - cy), r)
+    with pytest.raises(OutOfReachError):
+        simulate_circular_paths(arm, circles + [(0, 1900, 200, 100)], dt=0.01, processes=2)
+
+def test_simulation_float32_output(arm, circle_params):
+    params = {**circle_params, 'dt': 0.001}
+    sim_data = simulate_circular_path(arm, **params)
+    sim_data32 = simulate_circular_path(arm, **params, dtype=np.float32)
+    assert sim_data32.data.dtype == np.float32
+    # Derivatives are taken before the downcast, so even accelerations at a fine step survive
+    assert np.allclose(sim_data32['alpha1'], sim_data['alpha1'], atol=1e-5)
+    assert np.allclose(sim_data32['end_effector_x'], sim_data['end_effector_x'], atol=1e-3)
+
+def test_simulation_long_path_matches_fallback(arm, monkeypatch):
+    # Enough steps to go through the multithreaded kernel when numba is installed
+    params = dict(circle_center_x=300, circle_center_y=0, circle_radius=1000, speed_v=500, dt=0.0005)
+    sim_data = simulate_circular_path(arm, **params)
+    assert len(sim_data) >= simulation.PARALLEL_MIN_POINTS
+    monkeypatch.setattr(simulation, 'HAVE_NUMBA', False)
+    fallback = simulation._simulate_circular_path(arm, **params, dtype=np.float64) # Past the kept result
+    assert np.allclose(sim_data.data, fallback)
+
+def test_parallel_path_kernel_matches_serial():
+    from rob_arm_sim._kernels import path_kinematics, path_kinematics_parallel
+    angles = np.linspace(0, 2 * np.pi, 1000, endpoint=False)
+    target_x = 300 + 1000 * np.cos(angles)
+    target_y = 1000 * np.sin(angles)
+    serial, parallel = np.empty((2, 6, len(angles)))
+    path_kinematics(1200.0, 800.0, 0.0, 0.0, target_x, target_y, *serial)
+    path_kinematics_parallel(1200.0, 800.0, 0.0, 0.0, target_x, target_y, *parallel)
+    assert np.array_equal(serial, parallel)
+
+def test_simulation_reuses_cached_result(arm, circle_params):
+    first = simulate_circular_path(arm, **circle_params)
+    again = simulate_circular_path(RobotArm(L1=1200, L2=800, base_x=0, base_y=0), **circle_params)
+    assert again.data is first.data
+    assert not first.data.flags.writeable
+    arm.base_x = 10 # A moved arm is a different simulation
+    moved = simulate_circular_path(arm, **circle_params)
+    assert moved.data is not first.data
+    assert np.allclose(np.hypot(moved['joint_x'] - 10, moved['joint_y']), 1200)
+    arm.base_x = 0 # Only the last result is kept, so going back recomputes the first run
+    assert simulate_circular_path(arm, **circle_params).data is not first.data
@@ -0,0 +1,31 @@
+import pytest
+from rob_arm_sim.arm import RobotArm, OutOfReachError
+from rob_arm_sim.simulation import simulate_circular_path
+import numpy as np
+
+pytest.importorskip("jax")
+from rob_arm_sim.simulation_jax import simulate_circular_paths_jax
+
+def test_jax_simulation_matches_numpy():
+    arm = RobotArm(L1=1200, L2=800, base_x=0, base_y=0)
+    circles = [(0, 1500, 200, 100), (300, 0, 1000, 500)] # Both laps take 4*pi s
+    num_steps = 12000 # A step of about 1 ms, fine enough that float32 accelerations would be noise
+    laps = [2 * np.pi * r / v for _, _, r, v in circles]
+    # Half a step of slack either side, so both versions round the lap to exactly num_steps
+    results = simulate_circular_paths_jax(arm, circles, dt=max(laps) / (num_steps - 0.5))
+    assert len(results) == 2
+    for (cx, cy, r, v), lap, sim_data in zip(circles, laps, results):
+        expected = simulate_circular_path(arm, cx, cy, r, v, dt=lap / (num_steps - 0.5))
+        assert len(sim_data) == len(expected) == num_steps
+        assert sim_data.data.dtype == np.float64
+        assert np.allclose(sim_data['end_effector_x'], expected['end_effector_x'], atol=1e-6)
+        assert np.allclose(sim_data['theta1'], expected['theta1'], atol=1e-9)
+        for name in ('omega1', 'omega2'):
+            assert np.allclose(sim_data[name], expected[name], atol=1e-7)
+        for name in ('alpha1', 'alpha2'):
+            assert np.allclose(sim_data[name], expected[name], atol=1e-4)
+
+def test_jax_simulation_unreachable_circle():
+    arm = RobotArm(L1=100, L2=80, base_x=0, base_y=0)
+    with pytest.raises(OutOfReachError):
+        simulate_circular_paths_jax(arm, [(0, 100, 20, 10), (150, 0, 50, 10)], dt=0.01)